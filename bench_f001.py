@@ -0,0 +1,60 @@
+"""Benchmark del generador del Formulario 001 (formularios por segundo).
+
+Uso: python bench_f001.py [cantidad]
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+
+os.environ.setdefault("BOT_TOKEN", "benchmark")
+
+import bot
+
+logging.getLogger().setLevel(logging.WARNING)
+
+def datos_de_prueba(n):
+    return {
+        "apellidos": f"Perez {n}",
+        "nombres": "Juan",
+        "dni": f"{40000000 + n}",
+        "legajo": f"{60000 + n}",
+        "empresa": "Centro Universitario de Automatización y Robótica",
+        "tutor": "Juan Perez",
+        "fecha_inicio": "01/03/2026",
+        "fecha_fin": "01/05/2026",
+        "dias": "lunes, miércoles, viernes",
+        "total_horas": "200hs",
+        "objetivo": "Desarrollo de un sistema de adquisición de datos para un banco de pruebas.",
+    }
+
+def medir(nombre, cantidad, segundos):
+    print(f"{nombre:<38} {cantidad:>5} formularios  {cantidad / segundos:8.1f} form/s  "
+          f"{segundos / cantidad * 1000:8.2f} ms/form")
+
+async def main(cantidad):
+    t0 = time.perf_counter()
+    await bot.generar_f001_async(datos_de_prueba(-1))
+    medir("Primer formulario (parsea plantilla)", 1, time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    for n in range(cantidad):
+        bot.generar_f001(bot.valores_f001(datos_de_prueba(n)))
+    medir("Secuencial, plantilla en caché", cantidad, time.perf_counter() - t0)
+
+    bot._f001_cache.clear()
+    t0 = time.perf_counter()
+    await asyncio.gather(*(bot.generar_f001_async(datos_de_prueba(n)) for n in range(cantidad)))
+    medir(f"Pool de {bot.F001_WORKERS} hilos, datos distintos", cantidad, time.perf_counter() - t0)
+
+    repetidos = [datos_de_prueba(n) for n in range(8)]
+    for datos in repetidos:
+        await bot.generar_f001_async(datos)
+    t0 = time.perf_counter()
+    for n in range(cantidad):
+        await bot.generar_f001_async(repetidos[n % len(repetidos)])
+    medir("Datos repetidos (caché de salida)", cantidad, time.perf_counter() - t0)
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50))
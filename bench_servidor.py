@@ -0,0 +1,112 @@
+"""Benchmark del servidor HTTP: Flask/waitress en un hilo vs. servidor async (tornado).
+
+Levanta cada servidor en un proceso aparte (sin conectarse a Telegram) y mide
+latencia de / y /health, memoria residente e hilos del proceso. /webhook se mide
+solo en el servidor async: el webhook Flask de base responde 500 en cada POST
+(Application._get_running_loop no existe en PTB 22), así que no hay con qué comparar.
+
+Uso: python bench_servidor.py [cantidad]
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import statistics
+import subprocess
+import threading
+import warnings
+
+import requests
+
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+
+PUERTO = 18080
+UPDATE = {
+    "update_id": 1,
+    "message": {
+        "message_id": 1,
+        "date": 0,
+        "chat": {"id": 1, "type": "private"},
+        "from": {"id": 1, "is_bot": False, "first_name": "Bench"},
+        "text": "hola",
+    },
+}
+
+def servir(modo, puerto):
+    import bot
+
+    logging.getLogger().setLevel(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    bot.setup_telegram_app()
+
+    if modo == "flask":
+        # Igual que run_polling_mode: waitress en un hilo aparte
+        threading.Thread(
+            target=bot.serve, args=(bot.flask_app,),
+            kwargs={"host": "127.0.0.1", "port": puerto, "threads": 4}, daemon=True
+        ).start()
+        while True:
+            time.sleep(3600)
+
+    async def servidor_async():
+        bot.crear_servidor_async().listen(puerto, address="127.0.0.1")
+        await asyncio.Event().wait()
+
+    asyncio.run(servidor_async())
+
+def estado_proceso(pid):
+    estado = {}
+    with open(f"/proc/{pid}/status") as archivo:
+        for linea in archivo:
+            clave, _, valor = linea.partition(":")
+            if clave in ("VmRSS", "Threads"):
+                estado[clave] = valor.strip()
+    return estado
+
+def medir(sesion, metodo, url, cantidad, **kwargs):
+    tiempos = []
+    codigos = set()
+    for _ in range(cantidad):
+        t0 = time.perf_counter()
+        resp = sesion.request(metodo, url, **kwargs)
+        tiempos.append((time.perf_counter() - t0) * 1000)
+        codigos.add(resp.status_code)
+    tiempos.sort()
+    return statistics.median(tiempos), tiempos[int(len(tiempos) * 0.95) - 1], sorted(codigos)
+
+def comparar(cantidad):
+    base = f"http://127.0.0.1:{PUERTO}"
+    for modo in ("flask", "async"):
+        proceso = subprocess.Popen([sys.executable, __file__, "--servir", modo, str(PUERTO)])
+        try:
+            sesion = requests.Session()
+            for _ in range(100):
+                try:
+                    sesion.get(f"{base}/health", timeout=1)
+                    break
+                except requests.ConnectionError:
+                    time.sleep(0.1)
+
+            print(f"== {modo}")
+            for nombre, ruta in (("/", "/"), ("/health", "/health")):
+                p50, p95, codigos = medir(sesion, "GET", base + ruta, cantidad)
+                print(f"  {nombre:<9} p50 {p50:6.2f} ms  p95 {p95:6.2f} ms  HTTP {codigos}")
+            # Memoria antes de /webhook, para que los updates encolados no cuenten solo de un lado
+            estado = estado_proceso(proceso.pid)
+            print(f"  memoria {estado['VmRSS']}, hilos {estado['Threads']}")
+
+            if modo == "flask":
+                print("  /webhook  omitido: el webhook Flask de base responde HTTP 500 (ruta de error)")
+            else:
+                p50, p95, codigos = medir(sesion, "POST", f"{base}/webhook", cantidad, json=UPDATE)
+                print(f"  /webhook  p50 {p50:6.2f} ms  p95 {p95:6.2f} ms  HTTP {codigos} (sin comparación)")
+        finally:
+            proceso.terminate()
+            proceso.wait()
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--servir":
+        servir(sys.argv[2], int(sys.argv[3]))
+    else:
+        comparar(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -4,12 +4,30 @@ import logging
 import threading
 import requests
 import asyncio
+import signal
+import io
+import json
+import re
+import unicodedata
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from flask import Flask, request
 from waitress import serve
+from pypdf import PdfReader, PdfWriter
+import tornado.web
 
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, ContextTypes, filters
+from telegram import (
+    Update, InlineKeyboardButton, InlineKeyboardMarkup,
+    InlineQueryResultArticle, InlineQueryResultCachedDocument, InputTextMessageContent
+)
+from telegram.error import BadRequest
+from telegram.ext import (
+    Application, ApplicationHandlerStop, CommandHandler, MessageHandler, CallbackQueryHandler,
+    ConversationHandler, InlineQueryHandler, TypeHandler, ContextTypes, filters
+)
+from telegram.warnings import PTBUserWarning
 from pathlib import Path
 
 # =================== CONFIGURACIÓN DE LOGGING ===================
@@ -19,6 +37,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# La carga del Formulario 001 se sigue por chat/usuario a propósito (per_message=False):
+# los botones solo la inician o la terminan, así que el aviso de PTB no aplica
+warnings.filterwarnings(
+    "ignore",
+    message=r"If 'per_message=False', 'CallbackQueryHandler' will not be tracked",
+    category=PTBUserWarning
+)
+
 # =================== CONFIGURACIÓN ===================
 DOCS_DIR = Path(__file__).parent / "docs"
 DOCS_DIR.mkdir(exist_ok=True)
@@ -32,6 +58,25 @@ if not TOKEN:
     raise ValueError("❌ BOT_TOKEN no encontrado en variables de entorno")
 
 WEBHOOK_MODE = os.getenv("WEBHOOK_MODE", "False").lower() == "true"
+# Servidor HTTP en el mismo event loop que el bot (en vez de Flask/waitress en otro hilo)
+ASYNC_SERVER = os.getenv("ASYNC_SERVER", "False").lower() == "true"
+
+# Chat donde se suben los PDFs al arrancar para obtener sus file_id (opcional)
+DOCS_CACHE_CHAT_ID = os.getenv("DOCS_CACHE_CHAT_ID")
+INLINE_CACHE_TIME = int(os.getenv("INLINE_CACHE_TIME", "3600"))
+# Mientras falte el file_id de algún documento, Telegram no debe guardar respuestas incompletas
+INLINE_CACHE_TIME_INCOMPLETO = int(os.getenv("INLINE_CACHE_TIME_INCOMPLETO", "10"))
+BOT_URL = "https://t.me/PPS_Electronica_UTN_Bot"
+
+# Límite de updates entrantes por chat (token bucket)
+GUARD_RATE = float(os.getenv("GUARD_RATE", "1.0"))
+GUARD_BURST = int(os.getenv("GUARD_BURST", "5"))
+
+# Generador del Formulario 001: hilos del pool y formularios completos en caché
+F001_WORKERS = int(os.getenv("F001_WORKERS", "2"))
+F001_CACHE_MAX = int(os.getenv("F001_CACHE_MAX", "64"))
+# Segundos sin respuesta antes de descartar una carga del formulario a medio hacer
+F001_TIMEOUT = int(os.getenv("F001_TIMEOUT", "900"))
 
 # =================== KEEP ALIVE SERVICE ===================
 class KeepAliveService:
@@ -61,13 +106,92 @@ class KeepAliveService:
         thread.start()
         logger.info(f"✅ Keep-alive service started (every {interval_minutes} min)")
 
+# =================== GUARDIA DE UPDATES ENTRANTES ===================
+class InboundGuard:
+    """Descarta floods por chat y updates/callbacks repetidos antes de los handlers.
+
+    Los vistos se guardan en OrderedDict con vencimiento: como el TTL es fijo, el orden
+    de inserción es también el de vencimiento y se purgan desde el principio en O(1).
+    """
+    __slots__ = (
+        "rate", "burst", "ttl_update", "ttl_callback", "max_items",
+        "buckets", "updates_vistos", "callbacks_vistos", "contadores"
+    )
+
+    def __init__(self, rate=1.0, burst=5, ttl_update=300, ttl_callback=3, max_items=10000):
+        self.rate = rate
+        self.burst = burst
+        self.ttl_update = ttl_update
+        self.ttl_callback = ttl_callback
+        self.max_items = max_items
+        self.buckets = OrderedDict()            # chat_id -> (tokens, ultimo_acceso)
+        self.updates_vistos = OrderedDict()     # update_id -> vencimiento
+        self.callbacks_vistos = OrderedDict()   # (chat_id, callback_data) -> vencimiento
+        self.contadores = {"update_duplicado": 0, "callback_duplicado": 0, "rate_limit": 0}
+
+    def _visto(self, vistos, clave, ttl, ahora):
+        while vistos:
+            primera = next(iter(vistos))
+            if vistos[primera] > ahora:
+                break
+            del vistos[primera]
+
+        if clave in vistos:
+            return True
+        vistos[clave] = ahora + ttl
+        if len(vistos) > self.max_items:
+            vistos.popitem(last=False)
+        return False
+
+    def _permitir(self, chat_id, ahora):
+        bucket = self.buckets.pop(chat_id, None)
+        if bucket is None:
+            tokens = self.burst
+        else:
+            tokens = min(self.burst, bucket[0] + (ahora - bucket[1]) * self.rate)
+
+        permitido = tokens >= 1
+        if permitido:
+            tokens -= 1
+        # Reinsertar al final deja los chats inactivos al principio para desalojarlos
+        self.buckets[chat_id] = (tokens, ahora)
+        if len(self.buckets) > self.max_items:
+            self.buckets.popitem(last=False)
+        return permitido
+
+    def revisar(self, update):
+        """Devuelve el motivo para descartar el update, o None si puede pasar"""
+        ahora = time.monotonic()
+        motivo = None
+
+        if self._visto(self.updates_vistos, update.update_id, self.ttl_update, ahora):
+            motivo = "update_duplicado"
+        elif update.inline_query:
+            # Las consultas inline llegan con cada tecla y Telegram ya las cachea
+            return None
+        else:
+            origen = update.effective_chat or update.effective_user
+            if origen is None:
+                return None
+            query = update.callback_query
+            if query and query.data is not None and self._visto(
+                self.callbacks_vistos, (origen.id, query.data), self.ttl_callback, ahora
+            ):
+                motivo = "callback_duplicado"
+            elif not self._permitir(origen.id, ahora):
+                motivo = "rate_limit"
+
+        if motivo:
+            self.contadores[motivo] += 1
+        return motivo
+
 # =================== FLASK APP ===================
 flask_app = Flask(__name__)
 telegram_app = None
 keep_alive = None
+inbound_guard = InboundGuard(rate=GUARD_RATE, burst=GUARD_BURST)
 
-@flask_app.route('/')
-def home():
+def pagina_inicio():
     return '''
     <!DOCTYPE html>
     <html>
@@ -145,15 +269,23 @@ def home():
     </html>
     '''
 
-@flask_app.route('/health')
-def health():
+def estado_salud():
     return {
         "status": "ok", 
         "service": "telegram-bot-pps", 
         "timestamp": datetime.now().isoformat(),
         "version": "2.0",
-        "environment": "production"
-    }, 200
+        "environment": "production",
+        "guard": dict(inbound_guard.contadores)
+    }
+
+@flask_app.route('/')
+def home():
+    return pagina_inicio()
+
+@flask_app.route('/health')
+def health():
+    return estado_salud(), 200
 
 @flask_app.route('/webhook', methods=['POST'])
 def webhook():
@@ -171,6 +303,43 @@ def webhook():
             return 'ERROR', 500
     return 'NO JSON', 400
 
+# =================== SERVIDOR ASYNC (TORNADO) ===================
+# Mismas rutas que Flask pero en el event loop de la aplicación de Telegram:
+# sin pool de hilos WSGI ni salto entre hilos por cada update
+class InicioHandler(tornado.web.RequestHandler):
+    def get(self):
+        self.write(pagina_inicio())
+
+class HealthHandler(tornado.web.RequestHandler):
+    def get(self):
+        self.write(estado_salud())
+
+class WebhookHandler(tornado.web.RequestHandler):
+    async def post(self):
+        try:
+            data = json.loads(self.request.body)
+        except ValueError:
+            self.set_status(400)
+            self.write('NO JSON')
+            return
+
+        try:
+            update = Update.de_json(data, telegram_app.bot)
+            await telegram_app.update_queue.put(update)
+            logger.info(f"Webhook recibido: {update.update_id}")
+            self.write('OK')
+        except Exception as e:
+            logger.error(f"Error procesando webhook: {e}")
+            self.set_status(500)
+            self.write('ERROR')
+
+def crear_servidor_async():
+    return tornado.web.Application([
+        (r"/", InicioHandler),
+        (r"/health", HealthHandler),
+        (r"/webhook", WebhookHandler),
+    ])
+
 # =================== INFORMACIÓN DEL BOT ===================
 INFO = {
     "welcome": (
@@ -271,6 +440,7 @@ def teclado_documentacion():
     """Teclado para el submenú de documentación"""
     keyboard = [
         [InlineKeyboardButton("🧾 Formulario 001", callback_data="f001")],
+        [InlineKeyboardButton("✍️ Completar Formulario 001", callback_data="f001_generar")],
         [InlineKeyboardButton("🧾 Convenio Marco", callback_data="convenio_marco")],
         [InlineKeyboardButton("🧾 Convenio Específico", callback_data="convenio_especifico")],
         [InlineKeyboardButton("⬅️ Volver a Inicio PPS", callback_data="menu_inicio_pps")]
@@ -283,6 +453,337 @@ def teclado_volver_a_docs_inicio_pps():
     ]
     return InlineKeyboardMarkup(keyboard)
 
+def teclado_abrir_bot():
+    keyboard = [
+        [InlineKeyboardButton("💬 Abrir el bot", url=BOT_URL)]
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+# =================== DOCUMENTOS Y MODO INLINE ===================
+DOCUMENTOS = {
+    "f001": {
+        "path": F001_PDF,
+        "titulo": "🧾 Formulario 001",
+        "descripcion": "Solicitud de Práctica Supervisada (completar en digital)",
+        "claves": "formulario 001 f001 solicitud inicio documentacion",
+    },
+    "f001_ejemplo": {
+        "path": F001_EJEMPLO_PDF,
+        "titulo": "🧾 Ejemplo Formulario 001",
+        "descripcion": "Formulario 001 completo a modo de ejemplo",
+        "claves": "ejemplo formulario 001 f001 documentacion",
+    },
+    "convenio_marco": {
+        "path": CONV_MARCO_PDF,
+        "titulo": "📑 Convenio Marco de PPS",
+        "descripcion": "Lo completa la empresa una sola vez",
+        "claves": "convenio marco empresa art documentacion",
+    },
+    "convenio_especifico": {
+        "path": CONV_ESP_PDF,
+        "titulo": "📘 Convenio Específico de PPS",
+        "descripcion": "Solo si el/la estudiante no es parte de la empresa",
+        "claves": "convenio especifico empresa art documentacion",
+    },
+}
+
+SECCIONES_INLINE = {
+    "inicio_pps": {
+        "titulo": "🏭 Inicio de la PPS",
+        "descripcion": "Qué es la PPS y pasos para iniciarla",
+        "claves": "inicio pps practica profesional supervisada pasos",
+    },
+    "requisitos": {
+        "titulo": "✅ Requisitos académicos",
+        "descripcion": "Materias necesarias para iniciar la PPS",
+        "claves": "requisitos academicos materias inicio",
+    },
+    "docs_inicio": {
+        "titulo": "📄 Documentación inicial",
+        "descripcion": "Formulario 001, convenios y ART",
+        "claves": "documentacion documentos inicio formulario convenio art",
+    },
+    "monotributo": {
+        "titulo": "🧾 Empresa monotributista",
+        "descripcion": "Constancia de AFIP",
+        "claves": "monotributo monotributista afip constancia empresa",
+    },
+    "finalizacion": {
+        "titulo": "🔵 Finalización de la PPS",
+        "descripcion": "Informe final y certificado",
+        "claves": "finalizacion informe final certificado",
+    },
+    "faq": {
+        "titulo": "❓ Preguntas frecuentes",
+        "descripcion": "Dudas típicas sobre la PPS",
+        "claves": "preguntas frecuentes faq dudas",
+    },
+    "contacto": {
+        "titulo": "📩 Contacto / Cátedra",
+        "descripcion": "Mail y horarios de consulta",
+        "claves": "contacto mail catedra horarios consulta",
+    },
+}
+
+# Orden en que se muestran los resultados inline
+INLINE_ORDEN = list(DOCUMENTOS) + list(SECCIONES_INLINE)
+
+# file_id de Telegram por documento: se pueden fijar por entorno (FILE_ID_F001, ...)
+# y se completan solos la primera vez que el bot sube cada PDF
+FILE_IDS = {
+    clave: os.getenv(f"FILE_ID_{clave.upper()}")
+    for clave in DOCUMENTOS
+}
+
+INLINE_RESULTADOS = {}
+
+def normalizar(texto):
+    """Minúsculas y sin tildes, para comparar búsquedas"""
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+def construir_indice_inline():
+    """Arma el índice de prefijos -> claves de resultado (una sola vez al iniciar)"""
+    indice = {}
+    entradas = {**DOCUMENTOS, **SECCIONES_INLINE}
+    for clave in INLINE_ORDEN:
+        entrada = entradas[clave]
+        palabras = set(normalizar(entrada["titulo"] + " " + entrada["claves"]).split())
+        for palabra in palabras:
+            for i in range(1, len(palabra) + 1):
+                indice.setdefault(palabra[:i], []).append(clave)
+    return {prefijo: tuple(claves) for prefijo, claves in indice.items()}
+
+def resultado_seccion(clave):
+    seccion = SECCIONES_INLINE[clave]
+    # El texto compartido no lleva el "Selecciona una opción" del menú
+    texto = INFO[clave].split("\n\n👇")[0]
+    return InlineQueryResultArticle(
+        id=clave,
+        title=seccion["titulo"],
+        description=seccion["descripcion"],
+        input_message_content=InputTextMessageContent(texto, parse_mode="HTML"),
+        reply_markup=teclado_abrir_bot()
+    )
+
+def resultado_documento(clave):
+    documento = DOCUMENTOS[clave]
+    return InlineQueryResultCachedDocument(
+        id=clave,
+        title=documento["titulo"],
+        document_file_id=FILE_IDS[clave],
+        description=documento["descripcion"],
+        caption=f"<b>{documento['titulo']}</b>\n{documento['descripcion']}",
+        parse_mode="HTML",
+        reply_markup=teclado_abrir_bot()
+    )
+
+def registrar_file_id(clave, file_id):
+    """Guarda el file_id de un documento y deja listo su resultado inline"""
+    if FILE_IDS.get(clave) == file_id:
+        return
+    FILE_IDS[clave] = file_id
+    INLINE_RESULTADOS[clave] = resultado_documento(clave)
+    logger.info(f"file_id registrado para {clave}")
+
+def buscar_inline(texto):
+    """Devuelve los resultados precalculados que coinciden con todas las palabras"""
+    palabras = normalizar(texto).split()
+    if not palabras:
+        claves = INLINE_ORDEN
+    else:
+        encontradas = set(INLINE_INDICE.get(palabras[0], ()))
+        for palabra in palabras[1:]:
+            encontradas.intersection_update(INLINE_INDICE.get(palabra, ()))
+        claves = [clave for clave in INLINE_ORDEN if clave in encontradas]
+    return [INLINE_RESULTADOS[clave] for clave in claves if clave in INLINE_RESULTADOS]
+
+async def enviar_documento(user_message, clave):
+    """Envía un PDF reutilizando su file_id si Telegram ya lo tiene"""
+    file_id = FILE_IDS.get(clave)
+    if file_id:
+        try:
+            return await user_message.reply_document(document=file_id)
+        except BadRequest as e:
+            # file_id vencido, mal copiado o de otro token: se vuelve a subir el PDF
+            logger.warning(f"file_id inválido para {clave} ({e}), subiendo de nuevo")
+            FILE_IDS[clave] = None
+            INLINE_RESULTADOS.pop(clave, None)
+
+    path = DOCUMENTOS[clave]["path"]
+    with open(path, "rb") as archivo:
+        mensaje = await user_message.reply_document(document=archivo, filename=path.name)
+    registrar_file_id(clave, mensaje.document.file_id)
+    return mensaje
+
+async def precargar_documentos(application: Application):
+    """Sube los PDFs sin file_id a DOCS_CACHE_CHAT_ID para tenerlos en modo inline desde el inicio"""
+    if not DOCS_CACHE_CHAT_ID:
+        return
+    for clave, documento in DOCUMENTOS.items():
+        if FILE_IDS.get(clave) or not documento["path"].exists():
+            continue
+        try:
+            with open(documento["path"], "rb") as archivo:
+                mensaje = await application.bot.send_document(
+                    chat_id=DOCS_CACHE_CHAT_ID,
+                    document=archivo,
+                    filename=documento["path"].name,
+                    disable_notification=True
+                )
+            registrar_file_id(clave, mensaje.document.file_id)
+        except Exception as e:
+            logger.warning(f"No se pudo precargar {clave}: {e}")
+
+INLINE_INDICE = construir_indice_inline()
+INLINE_RESULTADOS.update({clave: resultado_seccion(clave) for clave in SECCIONES_INLINE})
+INLINE_RESULTADOS.update({clave: resultado_documento(clave) for clave in DOCUMENTOS if FILE_IDS[clave]})
+
+# =================== GENERADOR FORMULARIO 001 ===================
+# Datos que se piden al/la estudiante, en el orden del formulario
+F001_PREGUNTAS = [
+    ("apellidos", "Apellidos"),
+    ("nombres", "Nombres"),
+    ("dni", "DNI"),
+    ("legajo", "Legajo"),
+    ("fecha_nacimiento", "Fecha de nacimiento (dd/mm/aaaa)"),
+    ("direccion", "Tu dirección"),
+    ("localidad", "Tu localidad"),
+    ("provincia", "Tu provincia"),
+    ("celular", "Tu teléfono celular"),
+    ("email", "Tu e-mail"),
+    ("empresa", "Razón social de la empresa/institución"),
+    ("empresa_direccion", "Dirección de la empresa"),
+    ("empresa_localidad", "Localidad de la empresa"),
+    ("empresa_provincia", "Provincia de la empresa"),
+    ("empresa_telefono", "Teléfono de la empresa"),
+    ("empresa_email", "E-mail de la empresa"),
+    ("contacto", "Persona de contacto en la empresa"),
+    ("tutor", "Profesional supervisor (tutor)"),
+    ("cargo_tutor", "Cargo del tutor"),
+    ("fecha_inicio", "Fecha de inicio de la práctica (dd/mm/aaaa)"),
+    ("fecha_fin", "Fecha de finalización de la práctica (dd/mm/aaaa)"),
+    ("dias", "Días que asistís (ej: lunes, miércoles, viernes o lunes a viernes)"),
+    ("hora_inicio", "Horario de inicio (ej: 8hs)"),
+    ("hora_fin", "Horario de finalización (ej: 14hs)"),
+    ("total_dias", "Total de días hábiles"),
+    ("total_horas", "Total de horas a realizar (ej: 200hs)"),
+    ("objetivo", "Objetivo de la PPS (resumido pero claro)"),
+]
+
+# Campo del PDF -> dato (según la ubicación de cada campo en Formulario_001.pdf)
+F001_CAMPOS_TEXTO = {
+    "Text1": "apellidos", "Text2": "nombres", "Text3": "dni", "Text4": "legajo",
+    "Text5": "fecha_nacimiento", "Text6": "direccion", "Text7": "localidad",
+    "Text8": "provincia", "Text10": "celular", "Text11": "email",
+    "Text12": "empresa", "Text13": "empresa_direccion", "Text14": "empresa_localidad",
+    "Text15": "empresa_provincia", "Text17": "empresa_telefono", "Text18": "empresa_email",
+    "Text19": "contacto", "Text20": "tutor", "Text21": "cargo_tutor",
+    "Text22": "fecha_inicio", "Text23": "fecha_fin", "Text24": "hora_inicio",
+    "Text25": "hora_fin", "Text26": "total_dias", "Text27": "total_horas", "Text28": "objetivo",
+    "Text29": "departamento", "Text30": "alumno", "Text31": "legajo", "Text32": "dni",
+    "Text33": "empresa", "Text34": "tutor", "Text36": "fecha_inicio", "Text37": "fecha_fin",
+    "Text38": "total_horas",
+}
+F001_DIAS = ["lun", "mar", "mie", "jue", "vie"]
+F001_CAMPOS_DIAS = {
+    "Check Box1": "lun", "Check Box2": "mar", "Check Box3": "mie",
+    "Check Box4": "jue", "Check Box5": "vie",
+}
+# Un día suelto ("lunes", "mié") o un rango ("lunes a viernes", "lun-jue", "de martes al jueves")
+F001_DIAS_RE = re.compile(
+    r"\b(lun|mar|mie|jue|vie)(?:es|tes|rcoles|ves|rnes)?\b\.?"
+    r"(?:\s*(?:-|a|al|hasta)\s*(lun|mar|mie|jue|vie)(?:es|tes|rcoles|ves|rnes)?\b)?"
+)
+
+_f001_plantilla = None
+_f001_plantilla_lock = threading.Lock()
+_f001_local = threading.local()
+_f001_cache = OrderedDict()
+_f001_pool = ThreadPoolExecutor(max_workers=F001_WORKERS, thread_name_prefix="f001")
+
+def dias_f001(texto):
+    """Días hábiles mencionados en la respuesta, incluyendo rangos"""
+    dias = set()
+    for desde, hasta in F001_DIAS_RE.findall(normalizar(texto)):
+        inicio = F001_DIAS.index(desde)
+        fin = F001_DIAS.index(hasta) if hasta else inicio
+        dias.update(F001_DIAS[min(inicio, fin):max(inicio, fin) + 1])
+    return dias
+
+def valores_f001(datos):
+    """Arma el valor de cada campo del PDF a partir de las respuestas"""
+    datos = {
+        **datos,
+        "departamento": "Ingeniería Electrónica",
+        "alumno": f"{datos.get('apellidos', '')} {datos.get('nombres', '')}".strip(),
+    }
+    # Las fuentes del formulario son WinAnsi (cp1252): emojis y demás no se pueden dibujar
+    valores = {
+        campo: datos.get(clave, "").encode("cp1252", "ignore").decode("cp1252")
+        for campo, clave in F001_CAMPOS_TEXTO.items()
+    }
+    dias = dias_f001(datos.get("dias", ""))
+    for campo, dia in F001_CAMPOS_DIAS.items():
+        valores[campo] = "/0" if dia in dias else "/Off"
+    return valores
+
+def _plantilla_f001():
+    """PDF del formulario leído una sola vez y compartido por todos los hilos"""
+    global _f001_plantilla
+    with _f001_plantilla_lock:
+        if _f001_plantilla is None:
+            _f001_plantilla = F001_PDF.read_bytes()
+        return _f001_plantilla
+
+def _writer_f001():
+    """Formulario ya clonado para el hilo actual, junto con los campos de cada página.
+
+    Se reutiliza en cada llamado porque generar_f001 pisa todos los campos.
+    """
+    if getattr(_f001_local, "writer", None) is None:
+        writer = PdfWriter(clone_from=PdfReader(io.BytesIO(_plantilla_f001())))
+        campos_por_pagina = []
+        for page in writer.pages:
+            campos = set()
+            for anotacion in page.get("/Annots") or []:
+                nombre = anotacion.get_object().get("/T")
+                if nombre:
+                    campos.add(str(nombre))
+            campos_por_pagina.append(campos)
+        _f001_local.writer = writer
+        _f001_local.campos_por_pagina = campos_por_pagina
+    return _f001_local.writer, _f001_local.campos_por_pagina
+
+def generar_f001(valores):
+    """Completa el Formulario 001 y devuelve el PDF en bytes (corre en el pool)"""
+    writer, campos_por_pagina = _writer_f001()
+    for page, campos in zip(writer.pages, campos_por_pagina):
+        valores_pagina = {campo: valor for campo, valor in valores.items() if campo in campos}
+        if valores_pagina:
+            # auto_regenerate=True deja /NeedAppearances en true: el visor redibuja los campos,
+            # así el objetivo (multilínea) se ve completo en vez de una sola línea cortada
+            writer.update_page_form_field_values(page, valores_pagina, auto_regenerate=True)
+    salida = io.BytesIO()
+    writer.write(salida)
+    return salida.getvalue()
+
+async def generar_f001_async(datos):
+    """Devuelve el PDF completo sin bloquear el event loop; datos repetidos salen de la caché"""
+    valores = valores_f001(datos)
+    clave = tuple(sorted(valores.items()))
+    pdf = _f001_cache.get(clave)
+    if pdf is not None:
+        _f001_cache.move_to_end(clave)
+        return pdf
+
+    loop = asyncio.get_running_loop()
+    pdf = await loop.run_in_executor(_f001_pool, generar_f001, valores)
+    _f001_cache[clave] = pdf
+    if len(_f001_cache) > F001_CACHE_MAX:
+        _f001_cache.popitem(last=False)
+    return pdf
+
 # =================== HANDLERS DEL BOT ===================
 async def inicio(update: Update, context: ContextTypes.DEFAULT_TYPE):
     welcome_text = INFO["welcome"]
@@ -459,7 +960,8 @@ async def f001(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "Te dejo:\n"
         "1) el formulario vacío\n"
         "2) un ejemplo completo\n\n"
-        "Luego escribime <b>'preguntas f001'</b> para ver dudas típicas."
+        "Luego escribime <b>'preguntas f001'</b> para ver dudas típicas.\n"
+        "✍️ Con /generar_f001 te lo devuelvo completo con tus datos."
     )
     
     if isinstance(update, Update) and update.message:
@@ -476,10 +978,7 @@ async def f001(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
 
     if F001_PDF.exists():
-        await user_message.reply_document(
-            document=open(F001_PDF, "rb"), 
-            filename=F001_PDF.name
-        )
+        await enviar_documento(user_message, "f001")
     else:
         await user_message.reply_text(
             "⚠️ No encuentro el PDF del Formulario 001",
@@ -488,10 +987,7 @@ async def f001(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
 
     if F001_EJEMPLO_PDF.exists():
-        await user_message.reply_document(
-            document=open(F001_EJEMPLO_PDF, "rb"), 
-            filename=F001_EJEMPLO_PDF.name
-        )
+        await enviar_documento(user_message, "f001_ejemplo")
 
     if F001_EJEMPLO_PDF.exists():
         # Mensaje opcional con teclado después de enviar los archivos
@@ -523,10 +1019,7 @@ async def convenio_marco(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
     
     if CONV_MARCO_PDF.exists():
-        await user_message.reply_document(
-            document=open(CONV_MARCO_PDF, "rb"), 
-            filename=CONV_MARCO_PDF.name
-        )
+        await enviar_documento(user_message, "convenio_marco")
     else:
         await user_message.reply_text(
             "⚠️ No encuentro el PDF del Convenio Marco",
@@ -562,10 +1055,7 @@ async def convenio_especifico(update: Update, context: ContextTypes.DEFAULT_TYPE
             return
     
     if CONV_ESP_PDF.exists():
-        await user_message.reply_document(
-            document=open(CONV_ESP_PDF, "rb"), 
-            filename=CONV_ESP_PDF.name
-        )
+        await enviar_documento(user_message, "convenio_especifico")
     else:
         await user_message.reply_text(
             "⚠️ No encuentro el PDF del Convenio Marco",
@@ -581,6 +1071,113 @@ async def convenio_especifico(update: Update, context: ContextTypes.DEFAULT_TYPE
             reply_markup=teclado_volver_a_docs_inicio_pps()
         )
 
+F001_COMPLETANDO = 0
+
+def pregunta_f001(paso):
+    _, pregunta = F001_PREGUNTAS[paso]
+    return f"({paso + 1}/{len(F001_PREGUNTAS)}) <b>{pregunta}</b>"
+
+async def f001_generar_inicio(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Comienza la carga guiada del Formulario 001"""
+    if update.callback_query:
+        await update.callback_query.answer()
+        user_message = update.callback_query.message
+    else:
+        user_message = update.message
+
+    context.user_data["f001"] = {}
+    context.user_data["f001_paso"] = 0
+    await user_message.reply_text(
+        "✍️ <b>Completar Formulario 001</b>\n\n"
+        "Te voy a pedir tus datos y los de la empresa, y te devuelvo el formulario completo.\n"
+        "• Escribí <b>-</b> para dejar un dato en blanco\n"
+        "• Escribí /cancelar para salir\n\n"
+        + pregunta_f001(0),
+        parse_mode="HTML"
+    )
+    return F001_COMPLETANDO
+
+async def f001_generar_respuesta(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    paso = context.user_data.get("f001_paso", 0)
+    clave, _ = F001_PREGUNTAS[paso]
+    texto = (update.message.text or "").strip()
+    context.user_data["f001"][clave] = "" if texto == "-" else texto[:500]
+
+    paso += 1
+    if paso < len(F001_PREGUNTAS):
+        context.user_data["f001_paso"] = paso
+        await update.message.reply_text(pregunta_f001(paso), parse_mode="HTML")
+        return F001_COMPLETANDO
+
+    datos = context.user_data.pop("f001")
+    context.user_data.pop("f001_paso", None)
+    await update.message.reply_text("⏳ Generando tu Formulario 001...")
+    try:
+        pdf = await generar_f001_async(datos)
+    except Exception as e:
+        logger.error(f"Error generando Formulario 001: {e}")
+        await update.message.reply_text(
+            "⚠️ No pude generar el formulario. Probá de nuevo más tarde.",
+            reply_markup=teclado_volver_a_docs_inicio_pps()
+        )
+        return ConversationHandler.END
+
+    await update.message.reply_document(document=pdf, filename=F001_PDF.name)
+    await update.message.reply_text(
+        "✅ Formulario generado. Revisalo antes de imprimirlo y firmarlo.",
+        parse_mode="HTML",
+        reply_markup=teclado_volver_a_docs_inicio_pps()
+    )
+    return ConversationHandler.END
+
+def limpiar_f001(context):
+    context.user_data.pop("f001", None)
+    context.user_data.pop("f001_paso", None)
+
+async def f001_generar_cancelar(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    limpiar_f001(context)
+    await update.message.reply_text(
+        "❌ Carga del Formulario 001 cancelada.",
+        reply_markup=teclado_volver_a_docs_inicio_pps()
+    )
+    return ConversationHandler.END
+
+async def f001_generar_timeout(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """La carga quedó abandonada: se descartan las respuestas"""
+    limpiar_f001(context)
+    if update.effective_message:
+        await update.effective_message.reply_text(
+            "⌛ Se venció el tiempo para completar el Formulario 001.\n"
+            "Escribí /generar_f001 para empezar de nuevo."
+        )
+
+# Comandos del menú que terminan la carga del formulario si se usan a mitad de camino
+COMANDOS_MENU = {
+    "inicio": inicio,
+    "menu": menu,
+    "requisitos": requisitos,
+    "docs_inicio": docs_inicio,
+    "f001": f001,
+    "convenio_marco": convenio_marco,
+    "convenio_especifico": convenio_especifico,
+    "finalizacion": finalizacion,
+    "faq": faq,
+    "contacto": contacto,
+}
+
+async def f001_generar_salir(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Un comando del menú durante la carga la termina y se atiende como siempre"""
+    limpiar_f001(context)
+    comando = update.message.text.split()[0][1:].split("@")[0].lower()
+    await COMANDOS_MENU[comando](update, context)
+    return ConversationHandler.END
+
+async def f001_generar_salir_boton(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Un botón del menú durante la carga la termina y se atiende como siempre"""
+    limpiar_f001(context)
+    await manejar_botones(update, context)
+    return ConversationHandler.END
+
 async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
     text = (update.message.text or "").strip().lower()
 
@@ -592,12 +1189,76 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
         parse_mode="HTML"
     )
 
+async def guardia_entrante(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Corre antes que todos los handlers (grupo -1) y corta floods y reintentos"""
+    motivo = inbound_guard.revisar(update)
+    if motivo:
+        logger.info(f"Update {update.update_id} descartado: {motivo}")
+        if update.callback_query:
+            # Sin answer() el botón queda girando hasta el timeout de Telegram e invita a
+            # seguir apretando; no cuenta para el límite de mensajes salientes
+            try:
+                await update.callback_query.answer()
+            except Exception as e:
+                logger.warning(f"No se pudo responder el callback descartado: {e}")
+        raise ApplicationHandlerStop
+
+async def inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Modo inline (@PPS_Electronica_UTN_Bot convenio): responde solo con resultados precalculados"""
+    query = update.inline_query
+    t0 = time.perf_counter()
+    resultados = buscar_inline(query.query)
+    t_busqueda = time.perf_counter() - t0
+
+    completo = all(clave in INLINE_RESULTADOS for clave in DOCUMENTOS)
+    cache_time = INLINE_CACHE_TIME if completo else INLINE_CACHE_TIME_INCOMPLETO
+    try:
+        await query.answer(resultados, cache_time=cache_time, is_personal=False)
+    except BadRequest as e:
+        documentos = [r.id for r in resultados if r.id in DOCUMENTOS]
+        if not documentos:
+            raise
+        # Algún file_id es inválido y Telegram rechaza la respuesta entera:
+        # se descartan los documentos y se responde solo con las secciones
+        logger.warning(f"file_id inválido en modo inline ({e}), descartando {documentos}")
+        for clave in documentos:
+            FILE_IDS[clave] = None
+            INLINE_RESULTADOS.pop(clave, None)
+        resultados = [r for r in resultados if r.id not in DOCUMENTOS]
+        await query.answer(resultados, cache_time=INLINE_CACHE_TIME_INCOMPLETO, is_personal=False)
+    t_total = time.perf_counter() - t0
+
+    logger.info(
+        f"Inline query '{query.query}': {len(resultados)} resultados "
+        f"(búsqueda {t_busqueda * 1000:.3f} ms, total {t_total * 1000:.1f} ms)"
+    )
 
 # =================== CONFIGURACIÓN DEL BOT ===================
 def setup_telegram_app():
     global telegram_app
     
-    telegram_app = Application.builder().token(TOKEN).build()
+    telegram_app = Application.builder().token(TOKEN).post_init(precargar_documentos).build()
+    
+    telegram_app.add_handler(TypeHandler(Update, guardia_entrante), group=-1)
+    
+    # Va antes que los comandos para que, durante la carga, /menu y compañía la terminen
+    telegram_app.add_handler(ConversationHandler(
+        entry_points=[
+            CommandHandler("generar_f001", f001_generar_inicio),
+            CallbackQueryHandler(f001_generar_inicio, pattern="^f001_generar$"),
+        ],
+        states={
+            F001_COMPLETANDO: [MessageHandler(filters.TEXT & ~filters.COMMAND, f001_generar_respuesta)],
+            ConversationHandler.TIMEOUT: [TypeHandler(Update, f001_generar_timeout)],
+        },
+        fallbacks=[
+            CommandHandler("cancelar", f001_generar_cancelar),
+            CommandHandler(list(COMANDOS_MENU), f001_generar_salir),
+            CallbackQueryHandler(f001_generar_salir_boton),
+        ],
+        conversation_timeout=F001_TIMEOUT,
+        allow_reentry=True,
+    ))
     
     telegram_app.add_handler(CommandHandler("inicio", inicio))
     telegram_app.add_handler(CommandHandler("menu", menu))
@@ -612,6 +1273,7 @@ def setup_telegram_app():
     telegram_app.add_handler(CommandHandler("contacto", contacto))
     
     telegram_app.add_handler(CallbackQueryHandler(manejar_botones))
+    telegram_app.add_handler(InlineQueryHandler(inline_query))
     telegram_app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text))
     
     logger.info("✅ Aplicación de Telegram configurada correctamente")
@@ -628,6 +1290,8 @@ async def setup_webhook_async():
         )
         
         logger.info(f"🌐 Webhook configurado en: {webhook_url}")
+        # En modo webhook con Flask no corre post_init
+        await precargar_documentos(telegram_app)
         return True
     except Exception as e:
         logger.error(f"❌ Error configurando webhook: {e}")
@@ -699,17 +1363,77 @@ def run_webhook_mode():
         logger.error(f"❌ Error en modo webhook: {e}")
         return False
 
+async def run_async_server():
+    global keep_alive
+    
+    # Igual que run_polling: SIGINT/SIGTERM/SIGABRT (Render manda SIGTERM al redeployar)
+    # terminan de forma ordenada en vez de matar el proceso a mitad de camino
+    detener = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGABRT):
+        try:
+            loop.add_signal_handler(sig, detener.set)
+        except NotImplementedError:
+            # Windows no soporta add_signal_handler; queda el KeyboardInterrupt
+            pass
+    
+    port = int(os.environ.get('PORT', 10000))
+    servidor = crear_servidor_async().listen(port, address='0.0.0.0')
+    logger.info(f"🌍 Servidor async en puerto {port}")
+    print("✅ Servidor async iniciado (mismo event loop que el bot)")
+    
+    try:
+        async with telegram_app:
+            if telegram_app.post_init:
+                await telegram_app.post_init(telegram_app)
+            await telegram_app.start()
+            
+            try:
+                use_webhook = WEBHOOK_MODE and await setup_webhook_async()
+                if use_webhook:
+                    print("✅ Webhook configurado, bot listo para recibir mensajes")
+                else:
+                    if WEBHOOK_MODE:
+                        print("❌ Falló la configuración del webhook, cambiando a polling...")
+                    render_service_name = os.environ.get('RENDER_SERVICE_NAME', 'pps-electronica-utnfrc-bot')
+                    keep_alive = KeepAliveService(f"https://{render_service_name}.onrender.com")
+                    keep_alive.start(interval_minutes=8)
+                    await telegram_app.updater.start_polling(
+                        poll_interval=1.0,
+                        timeout=30,
+                        drop_pending_updates=True,
+                        allowed_updates=Update.ALL_TYPES
+                    )
+                    print("✅ Bot en modo polling")
+                print("=" * 60)
+                
+                await detener.wait()
+                print("\n🛑 Señal de terminación recibida, deteniendo el bot...")
+            finally:
+                if keep_alive:
+                    keep_alive.running = False
+                if telegram_app.updater.running:
+                    await telegram_app.updater.stop()
+                await telegram_app.stop()
+    finally:
+        servidor.stop()
+
 def main():
     print("=" * 60)
     print("🚀 INICIANDO BOT PPS - INGENIERÍA ELECTRÓNICA UTN FRC")
     print("=" * 60)
     print(f"Modo: {'WEBHOOK' if WEBHOOK_MODE else 'POLLING + KEEP-ALIVE'}")
+    print(f"Servidor: {'ASYNC (tornado)' if ASYNC_SERVER else 'FLASK (waitress)'}")
     print(f"Token: {TOKEN[:10]}...")
     print(f"Directorio docs: {DOCS_DIR}")
     print("=" * 60)
     
     setup_telegram_app()
     
+    if ASYNC_SERVER:
+        asyncio.run(run_async_server())
+        return
+    
     use_webhook = WEBHOOK_MODE
     
     if use_webhook: